@@ -1,29 +1,58 @@
+from functools import lru_cache
+
 CSI = b"\x1b["
 
 
+def sgr(*codes: int) -> bytes:
+    """One SGR sequence carrying every code, e.g. sgr(1, 7) -> ESC[1;7m."""
+    return CSI + ";".join(str(c) for c in codes).encode() + b"m"
+
+
+# Fixed sequences, built once at import time.
+CLEAR = CSI + b"2J" + CSI + b"H"
+HIDE_CURSOR = CSI + b"?25l"
+SHOW_CURSOR = CSI + b"?25h"
+CLEAR_EOL = CSI + b"K"
+RESET = sgr(0)
+REV_ON = sgr(7)
+REV_OFF = sgr(27)
+
+
 def clear() -> bytes:
-    return CSI + b"2J" + CSI + b"H"
+    return CLEAR
 
 
+@lru_cache(maxsize=4096)
 def move(row: int, col: int) -> bytes:
     return CSI + f"{row};{col}H".encode()
 
 
+# move(row, 1) for the rows any real terminal has, indexed by row
+_MOVE_COL1 = tuple(CSI + f"{r};1H".encode() for r in range(256))
+
+
+def move_col1(row: int) -> bytes:
+    """move(row, 1) as a table lookup; full-width rows are always drawn from column 1."""
+    if row < len(_MOVE_COL1):
+        return _MOVE_COL1[row]
+    return move(row, 1)
+
+
 def rev(on: bool) -> bytes:
-    return CSI + (b"7m" if on else b"0m")
+    return REV_ON if on else REV_OFF
 
 
 def hide_cursor() -> bytes:
-    return CSI + b"?25l"
+    return HIDE_CURSOR
 
 
 def show_cursor() -> bytes:
-    return CSI + b"?25h"
+    return SHOW_CURSOR
 
 
 def clear_eol() -> bytes:
-    return CSI + b"K"
+    return CLEAR_EOL
 
 
 def reset() -> bytes:
-    return CSI + b"0m"
+    return RESET
@@ -1,16 +1,104 @@
 import argparse
+import atexit
+import io
 import os
-import select
-import textwrap
+import queue
+import re
+import selectors
+import signal
+import sys
+import threading
 import time
-from typing import List
+import unicodedata
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import accumulate, chain, islice
+from os.path import commonprefix
+from typing import Callable, Deque, Dict, Iterable, List, Tuple
 
 from . import ansi
 from .config import load_config
-from .llm_openai import OpenAIClient, StreamResult
+from .llm_openai import OpenAIClient, StreamCancel, StreamResult
 from .prompts import load_presets, load_system_prompt, select_preset
-from .retrieval import find_matches, format_context, load_kb
-from .ttyio import open_tty, read_bytes, write_bytes
+from .retrieval import load_kb, retrieve
+from .ttyio import open_tty, read_bytes, write_bytes, writev_bytes
+
+
+def _wrap_split(para: str, width: int) -> Tuple[List[str], str]:
+    """Greedy fixed-width wrap that breaks after spaces and keeps them.
+
+    Returns the full rows and the unfinished remainder. Words longer than
+    the width are hard-broken. Whitespace is never collapsed; the only space
+    dropped is one that falls exactly on a break, so a row never starts with
+    the separator of the word before it.
+    """
+    if "\t" in para:
+        para = para.expandtabs()
+    if not para.isascii():
+        return _wrap_split_wide(para, width)
+    out: List[str] = []
+    while len(para) > width:
+        if para[width] == " ":
+            out.append(para[:width])
+            para = para[width + 1 :]
+            continue
+        cut = para.rfind(" ", 0, width) + 1
+        if cut <= 1:
+            cut = width
+        out.append(para[:cut])
+        para = para[cut:]
+    return out, para
+
+
+def _char_width(ch: str) -> int:
+    """Terminal columns taken by one code point: 0 for combining marks, 2 for wide CJK."""
+    if unicodedata.combining(ch):
+        return 0
+    return 2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1
+
+
+def _wrap_split_wide(para: str, width: int) -> Tuple[List[str], str]:
+    """_wrap_split for text with non-ASCII characters, measured in display columns.
+
+    Cumulative widths are computed once, and each break point is found
+    with a binary search instead of re-measuring the row.
+    """
+    ends = list(accumulate(map(_char_width, para)))  # columns used by para[: i + 1]
+    out: List[str] = []
+    start = 0
+    used = 0  # columns consumed by the rows already emitted
+    while ends[-1] - used > width:
+        end = max(bisect_right(ends, used + width, start), start + 1)
+        if end < len(para) and para[end] == " ":
+            out.append(para[start:end])
+            start = end + 1
+        else:
+            cut = para.rfind(" ", start, end) + 1
+            if cut <= start + 1:
+                cut = end
+            out.append(para[start:cut])
+            start = cut
+        used = ends[start - 1]
+    return out, para[start:]
+
+
+def _fast_wrap(para: str, width: int) -> List[str]:
+    rows, rest = _wrap_split(para, width)
+    if rest or not rows:
+        rows.append(rest)
+    return rows
+
+
+@lru_cache(maxsize=512)
+def _wrap_paragraph(para: str, width: int) -> Tuple[str, ...]:
+    """Wrap a single paragraph; cached so re-wrapping a growing reply only pays for its tail."""
+    return tuple(_fast_wrap(para, width))
+
+
+# the line boundaries str.splitlines() breaks on; "\r\n" counts as one
+_LINE_BREAK_RE = re.compile("\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
 
 
 def wrap(text: str, width: int) -> List[str]:
@@ -19,18 +107,95 @@ def wrap(text: str, width: int) -> List[str]:
         if para == "":
             out.append("")
         else:
-            out.extend(
-                textwrap.wrap(
-                    para,
-                    width=width,
-                    replace_whitespace=False,
-                    drop_whitespace=False,
-                )
-                or [""]
-            )
+            out.extend(_wrap_paragraph(para, width))
     return out
 
 
+@lru_cache(maxsize=8)
+def _shortcut_grid_rows(cols: int) -> Tuple[str, ...]:
+    """Rows of the 2x2 shortcut grid for a given width; the content never changes."""
+    width = min(cols, 78)
+    gap = 4
+    cell_w = max(18, (width - gap - 4) // 2)
+    top = "+" + "-" * cell_w + "+"
+
+    def box_row(left: str, right: str) -> str:
+        return (
+            "|" + left[:cell_w].ljust(cell_w) + "|" + " " * gap + "|" + right[:cell_w].ljust(cell_w) + "|"
+        )
+
+    row_gap = " " * (len(top) * 2 + gap)
+    rows_top = [
+        top + " " * gap + top,
+        box_row("/1 Search web (/search <topic>)", "/2 Toggle context (/ctx)"),
+        box_row("Get current info with citations", "Turn retrieval context on/off"),
+        top + " " * gap + top,
+    ]
+    rows_bottom = [
+        top + " " * gap + top,
+        box_row("/3 Tutorial (/tutorial)", "/4 Models (/model <id>)"),
+        box_row("How to use AMBER AI", "List or set available models"),
+        top + " " * gap + top,
+    ]
+    return tuple(rows_top + [row_gap] + rows_bottom + [""])
+
+
+# Distinct status bars kept encoded; the cache is simply emptied when full.
+STATUS_CACHE_SIZE = 32
+
+_SPLASH_ART = (
+    "    ___              __                 ___    ____",
+    "   /   |  ____ ___  / /_  ___  _____   /   |  /  _/",
+    "  / /| | / __ `__ \\/ __ \\/ _ \\/ ___/  / /| |  / /  ",
+    " / ___ |/ / / / / / /_/ /  __/ /     / ___ |_/ /   ",
+    "/_/  |_/_/ /_/ /_/_.___/\\___/_/     /_/  |_/___/   ",
+)
+_SPLASH_SUBHEADER = ""
+_SPLASH_LABEL = "Your Name"
+
+
+@lru_cache(maxsize=4)
+def _splash_template(rows: int, cols: int) -> Tuple[bytes, int, int, int]:
+    """The static part of the splash screen and where its name field sits.
+
+    Returns (prefix bytes, box top row, box column, field width).
+    """
+    art = _SPLASH_ART
+    subheader = _SPLASH_SUBHEADER
+    parts: List[bytes] = [ansi.CLEAR]
+
+    total_height = len(art) + 1 + 3 + 1  # art + subheader + box + help
+    start_row = max(1, (rows - total_height) // 2 + 1)
+    max_art_width = max(len(a) for a in art)
+    col_offset = max(1, (cols - max_art_width) // 2 + 1)
+
+    for idx, line in enumerate(art):
+        parts.append(ansi.move(start_row + idx, col_offset))
+        parts.append(line[:cols].encode(errors="ignore"))
+
+    if subheader:
+        sub_col = max(1, (cols - len(subheader)) // 2 + 1)
+        parts.append(ansi.move(start_row + len(art) + 1, sub_col))
+        parts.append(subheader[:cols].encode(errors="ignore"))
+
+    box_width = max(20, min(cols - 8, 68))
+    box_col = max(1, (cols - box_width) // 2 + 1)
+    box_top = start_row + len(art) + (3 if subheader else 1)
+    horiz = ("+" + "-" * (box_width - 2) + "+").encode()
+    parts.append(ansi.move(box_top, box_col))
+    parts.append(horiz)
+    parts.append(ansi.move(box_top + 2, box_col))
+    parts.append(horiz)
+
+    help_line = "(Enter to login)"
+    help_col = max(1, (cols - len(help_line)) // 2 + 1)
+    parts.append(ansi.move(box_top + 4, help_col))
+    parts.append(help_line[:cols].encode(errors="ignore"))
+
+    field_width = box_width - len(f"| {_SPLASH_LABEL}: ") - 2
+    return b"".join(parts), box_top, box_col, field_width
+
+
 class UI:
     def __init__(
         self,
@@ -46,7 +211,10 @@ class UI:
         self.preset = preset
         self.refresh_ms = refresh_ms
         self.no_ansi = no_ansi
-        self.lines: List[str] = []
+        # bounded scrollback; the oldest rows fall off the front
+        self._max_lines = max(1000, 8 * rows)
+        self.lines: Deque[str] = deque(maxlen=self._max_lines)
+        self._lines_enc: Deque[bytes] = deque(maxlen=self._max_lines)  # self.lines pre-encoded for render
         self.mode = "splash"  # splash | chat
         self.splash_input = ""
         self.splash_input_limit = max(8, min(self.cols - 20, 40))
@@ -59,23 +227,33 @@ class UI:
         self.session_tokens = 0
         self.session_cost = 0.0
         self.interrupted = False
-        self.history: List[dict] = []  # Conversation history
+        self.dirty = False  # state changed since the last frame was written
+        self.input_dirty = False  # only the input line changed since then
+        self.typeahead = b""  # keys typed during a reply from the first Enter on, replayed after it
         self.max_history = 20  # Max messages to keep
+        self.history: Deque[dict] = deque(maxlen=self.max_history)  # Conversation history
         self.scroll_offset = 0
         self.personalization_sent = False
         self.personalization_note = ""
         self.empty_state = False
+        self._ai_tail = ""  # source text of the unfinished last row of the block being streamed
+        self._ai_tail_shown = False  # whether that row is currently in the live block
+        self._ai_col = 0  # columns of its paragraph already wrapped into rows before that tail
+        self._ai_cr = False  # the last text ended in "\r", so a leading "\n" completes that break
+        # rows of the reply being streamed, kept off the scrollback deques so
+        # re-wrapping the tail never evicts or pops history; shown after them
+        self._live_block: List[str] = []
+        self._live_enc: List[bytes] = []
+        self._prev_frame: List[bytes] = []  # last frame written, one entry per row
+        self._frame_cols = cols
+        self._header_key: Tuple = ()
+        self._header_row = b""
+        self._status_cache: Dict[Tuple, bytes] = {}  # encoded status bars, see STATUS_CACHE_SIZE
         self.available_models: List[str] = [
             "gpt-5.2-2025-12-11",
             "gpt-5-nano-2025-08-07",
             "gpt-4o",
         ]
-        self.shortcuts = {
-            "/1": "search",
-            "/2": "ctx",
-            "/3": "tutorial",
-            "/4": "models",
-        }
         self.commands = [
             "/help",
             "/new",
@@ -87,59 +265,120 @@ class UI:
             "/tutorial",
             "/search",
         ]
+        # every prefix of every command -> the commands it completes, in
+        # declaration order, so the status hint is one dict lookup per keystroke
+        self._command_hints: Dict[str, Tuple[str, ...]] = {}
+        for c in self.commands:
+            for i in range(1, len(c) + 1):
+                self._command_hints[c[:i]] = self._command_hints.get(c[:i], ()) + (c,)
+        self._command_set = frozenset(self.commands)
+        # lower-cased model names, kept in step with available_models by add_model
+        self._models_lower = [m.lower() for m in self.available_models]
+
+    def add_model(self, name: str) -> None:
+        """Register a model id for /model completion."""
+        if name not in self.available_models:
+            self.available_models.append(name)
+            self._models_lower.append(name.lower())
+
+    def push_lines(self, lines: Iterable[str]) -> None:
+        """Append transcript rows, keeping the encoded copy in step."""
+        for ln in lines:
+            self.lines.append(ln)
+            self._lines_enc.append(ln.encode("utf-8", "ignore"))
+        self.dirty = True
+
+    def clear_lines(self) -> None:
+        self.lines.clear()
+        self._lines_enc.clear()
+        self.dirty = True
 
     def add_block(self, prefix: str, text: str) -> None:
-        for ln in wrap(prefix + text, self.cols):
-            self.lines.append(ln[: self.cols])
-        self.lines.append("")
+        self.push_lines(ln[: self.cols] for ln in wrap(prefix + text, self.cols))
+        self.push_lines([""])
+
+    def begin_stream(self, prefix: str) -> None:
+        """Open a live block at the end of the transcript for stream_text() to grow."""
+        self._ai_tail = prefix
+        self._ai_tail_shown = False
+        self._ai_col = 0
+        self._ai_cr = False
+        self._live_block.clear()
+        self._live_enc.clear()
+
+    def _push_live(self, rows: Iterable[str]) -> None:
+        for ln in rows:
+            self._live_block.append(ln)
+            self._live_enc.append(ln.encode("utf-8", "ignore"))
+
+    def stream_text(self, text: str) -> None:
+        """Append streamed text to the live block, re-wrapping only its unfinished last row.
+
+        The rows come out the same as wrap() gives for the whole reply: lines
+        break where str.splitlines() would break them, tabs stop relative to
+        the start of their paragraph, and a paragraph that ended exactly on a
+        full row gets no extra blank row.
+        """
+        if self._ai_tail_shown:
+            self._live_block.pop()
+            self._live_enc.pop()
+        if text:
+            after_cr, self._ai_cr = self._ai_cr, text.endswith("\r")
+            if after_cr and text[0] == "\n":
+                text = text[1:]  # "\r\n" split across two chunks
+        tail = self._ai_tail
+        col = self._ai_col
+        for n, part in enumerate(_LINE_BREAK_RE.split(text)):
+            if n:
+                # the paragraph is done; its last row only still needs showing
+                # if it has text, or if the paragraph had no rows at all
+                if tail or not col:
+                    self._push_live([tail])
+                tail, col = "", 0
+            if "\t" in part:
+                pad = (col + len(tail)) % 8
+                part = (" " * pad + part).expandtabs()[pad:]
+            para = tail + part
+            rows, tail = _wrap_split(para, self.cols)
+            self._push_live(rows)
+            col += len(para) - len(tail)
+        self._ai_tail = tail
+        self._ai_col = col
+        # an empty tail after a full row means the next text starts a fresh row
+        self._ai_tail_shown = bool(tail) or not col
+        if self._ai_tail_shown:
+            self._push_live([tail])
+
+    def end_stream(self) -> None:
+        """Drop the live block so the finished reply can be added with add_block()."""
+        self._ai_tail = ""
+        self._ai_tail_shown = False
+        self._ai_col = 0
+        self._ai_cr = False
+        self._live_block.clear()
+        self._live_enc.clear()
 
     def user_prefix(self) -> str:
         return f"{self.user_label}: "
 
     def add_to_history(self, role: str, content: str) -> None:
+        # the deque's maxlen drops the oldest message once max_history is reached
         self.history.append({"role": role, "content": content})
-        # Trim to max_history (keep pairs to maintain context)
-        while len(self.history) > self.max_history:
-            self.history.pop(0)
 
     def clear_history(self) -> None:
         self.history.clear()
 
     def add_shortcut_grid(self, center: bool = True) -> None:
         """Render a 2x2 grid of shortcut suggestions into the transcript."""
-        width = min(self.cols, 78)
-        gap = 4
-        cell_w = max(18, (width - gap - 4) // 2)
-        top = "+" + "-" * cell_w + "+"
-
-        def box_row(left: str, right: str) -> str:
-            return (
-                "|" + left[:cell_w].ljust(cell_w) + "|" + " " * gap + "|" + right[:cell_w].ljust(cell_w) + "|"
-            )
-
-        row_gap = " " * (len(top) * 2 + gap)
-        rows_top = [
-            top + " " * gap + top,
-            box_row("/1 Search web (/search <topic>)", "/2 Toggle context (/ctx)"),
-            box_row("Get current info with citations", "Turn retrieval context on/off"),
-            top + " " * gap + top,
-        ]
-        rows_bottom = [
-            top + " " * gap + top,
-            box_row("/3 Tutorial (/tutorial)", "/4 Models (/model <id>)"),
-            box_row("How to use AMBER AI", "List or set available models"),
-            top + " " * gap + top,
-        ]
-        rows = rows_top + [row_gap] + rows_bottom
-        grid_lines = rows + [""]
+        grid_lines = _shortcut_grid_rows(self.cols)
 
         if center:
             height = self.viewport_height()
             remaining = height - len(self.lines) - len(grid_lines)
             pad = max(0, remaining // 2)
-            self.lines.extend([""] * pad)
+            self.push_lines([""] * pad)
 
-        self.lines.extend(grid_lines)
+        self.push_lines(grid_lines)
         self.empty_state = True
 
     def clear_empty_state(self) -> None:
@@ -149,7 +388,8 @@ class UI:
         preserved = [ln for ln in self.lines if ln.startswith("SYS: ")]
         if preserved and preserved[-1] != "":
             preserved.append("")
-        self.lines = preserved or []
+        self.clear_lines()
+        self.push_lines(preserved)
         self.empty_state = False
 
     def viewport_height(self) -> int:
@@ -158,175 +398,235 @@ class UI:
             return max(1, self.rows - 1)
         return max(1, self.rows - 3)
 
+    def transcript_len(self) -> int:
+        """Rows in the scrollback plus the live block."""
+        return len(self.lines) + len(self._live_block)
+
     def _clamp_scroll(self, height: int) -> None:
-        max_offset = max(len(self.lines) - height, 0)
+        max_offset = max(self.transcript_len() - height, 0)
         if self.scroll_offset > max_offset:
             self.scroll_offset = max_offset
 
-    def _view_slice(self, height: int) -> List[str]:
+    def _view_rows(self, rows: Deque, live: List, height: int) -> list:
+        """The visible window of rows, walked from the newest end (the live block)."""
         self._clamp_scroll(height)
-        start = max(len(self.lines) - height - self.scroll_offset, 0)
-        end = start + height
-        return self.lines[start:end]
+        newest_first = chain(reversed(live), reversed(rows))
+        view = list(islice(newest_first, self.scroll_offset, self.scroll_offset + height))
+        view.reverse()
+        return view
 
     def render_plain(self) -> bytes:
         top = 0
         bottom = self.rows - 2
         height = bottom - top + 1
-        view = self._view_slice(height)
-        buf = []
-        buf.append(f"[ADDS AI Chat | model: {self.model}]")
-        buf.append("")
-        buf.extend(view)
-        buf.append(f"[{self.status}]")
-        buf.append("> " + self.input_buf)
-        return ("\n".join(buf) + "\n").encode(errors="ignore")
+        # transcript rows are already encoded, so the frame is a single bytes join
+        buf: List[bytes] = [f"[ADDS AI Chat | model: {self.model}]".encode(errors="ignore"), b""]
+        buf.extend(self._view_rows(self._lines_enc, self._live_enc, height))
+        buf.append(f"[{self.status}]".encode(errors="ignore"))
+        buf.append(("> " + self.input_buf).encode(errors="ignore"))
+        buf.append(b"")  # trailing newline
+        return b"\n".join(buf)
 
     def render_splash(self) -> bytes:
-        art = [
-            "    ___              __                 ___    ____",
-            "   /   |  ____ ___  / /_  ___  _____   /   |  /  _/",
-            "  / /| | / __ `__ \\/ __ \\/ _ \\/ ___/  / /| |  / /  ",
-            " / ___ |/ / / / / / /_/ /  __/ /     / ___ |_/ /   ",
-            "/_/  |_/_/ /_/ /_/_.___/\\___/_/     /_/  |_/___/   ",
-        ]
-        subheader = ""
-        call_sign_label = "Your Name"
         prompt = self.splash_input[: self.splash_input_limit]
 
         if self.no_ansi:
             lines: List[str] = []
-            lines.extend(art)
-            lines.append(subheader)
+            lines.extend(_SPLASH_ART)
+            lines.append(_SPLASH_SUBHEADER)
             lines.append("")
-            lines.append(f"[{call_sign_label}]> {prompt}")
+            lines.append(f"[{_SPLASH_LABEL}]> {prompt}")
             lines.append("(press Enter to login)")
             return ("\n".join(lines) + "\n").encode(errors="ignore")
 
-        b = bytearray()
-        b += ansi.hide_cursor()
-        b += ansi.clear()
-
-        total_height = len(art) + 1 + 3 + 1  # art + subheader + box + help
-        start_row = max(1, (self.rows - total_height) // 2 + 1)
-        max_art_width = max(len(a) for a in art)
-        col_offset = max(1, (self.cols - max_art_width) // 2 + 1)
-
-        for idx, line in enumerate(art):
-            b += ansi.move(start_row + idx, col_offset)
-            b += line[: self.cols].encode(errors="ignore")
-
-        if subheader:
-            sub_col = max(1, (self.cols - len(subheader)) // 2 + 1)
-            b += ansi.move(start_row + len(art) + 1, sub_col)
-            b += subheader[: self.cols].encode(errors="ignore")
-
-        box_width = max(20, min(self.cols - 8, 68))
-        box_col = max(1, (self.cols - box_width) // 2 + 1)
-        box_top = start_row + len(art) + (3 if subheader else 1)
-        horiz = "+" + "-" * (box_width - 2) + "+"
-        b += ansi.move(box_top, box_col)
-        b += horiz.encode()
-
-        label = f"| {call_sign_label}: "
-        field_width = box_width - len(label) - 2
+        self.invalidate()
+        # everything but the typed name depends only on the screen size
+        prefix, box_top, box_col, field_width = _splash_template(self.rows, self.cols)
+        label = f"| {_SPLASH_LABEL}: "
         trimmed = prompt[:field_width]
-        field = (label + trimmed).ljust(box_width - 1) + "|"
-        b += ansi.move(box_top + 1, box_col)
-        b += field.encode(errors="ignore")
-
-        b += ansi.move(box_top + 2, box_col)
-        b += horiz.encode()
-
-        help_line = "(Enter to login)"
-        help_col = max(1, (self.cols - len(help_line)) // 2 + 1)
-        b += ansi.move(box_top + 4, help_col)
-        b += help_line[: self.cols].encode(errors="ignore")
-
+        field = (label + trimmed).ljust(field_width + len(label) + 1) + "|"
         cursor_col = box_col + len(label) + len(trimmed)
-        b += ansi.move(box_top + 1, cursor_col)
-        b += ansi.show_cursor()
-        return bytes(b)
+        return b"".join(
+            (
+                prefix,
+                ansi.move(box_top + 1, box_col),
+                field.encode(errors="ignore"),
+                ansi.move(box_top + 1, cursor_col),
+            )
+        )
 
-    def render(self) -> bytes:
-        if self.mode == "splash":
-            return self.render_splash()
-        if self.no_ansi:
-            return self.render_plain()
+    def invalidate(self) -> None:
+        """Forget the last emitted frame so the next render repaints everything."""
+        self._prev_frame = []
 
-        b = bytearray()
-        b += ansi.hide_cursor()
-        b += ansi.clear()
+    def build_frame(self) -> List[bytes]:
+        """Encode every screen row (header, transcript, status, input) as bytes."""
+        frame: List[bytes] = []
 
-        # header
-        b += ansi.rev(True)
-        b += ansi.move(1, 1)
-        preset_str = f" | preset: {self.preset}" if self.preset else ""
-        hdr = f" AMBER AI Chat | model: {self.model}{preset_str} | /help /clear /quit "
-        b += hdr[: self.cols].ljust(self.cols).encode()
-        b += ansi.reset()
+        # header: only rebuilt when model, preset or width change
+        header_key = (self.model, self.preset, self.cols)
+        if header_key != self._header_key:
+            preset_str = f" | preset: {self.preset}" if self.preset else ""
+            hdr = f" AMBER AI Chat | model: {self.model}{preset_str} | /help /clear /quit "
+            self._header_row = ansi.REV_ON + hdr[: self.cols].ljust(self.cols).encode() + ansi.RESET
+            self._header_key = header_key
+        frame.append(self._header_row)
 
         # transcript window
-        top = 2
-        bottom = self.rows - 2
-        height = bottom - top + 1
-        view = self._view_slice(height)
-
-        for i in range(height):
-            b += ansi.move(top + i, 1)
-            b += ansi.clear_eol()
-            if i < len(view):
-                b += view[i].encode(errors="ignore")
+        height = self.rows - 3
+        view = self._view_rows(self._lines_enc, self._live_enc, height)
+        frame.extend(view)
+        frame.extend([b""] * (height - len(view)))
 
-        # status bar (with command suggestions when typing /)
-        b += ansi.rev(True)
-        b += ansi.move(self.rows - 1, 1)
+        frame.append(self._status_bytes())
+        frame.append(self._input_bytes())
+        return frame
 
-        # Check for command suggestions
+    def _status_bytes(self) -> bytes:
+        """The status bar, with command or model suggestions while typing /."""
         cmd_hint = ""
         model_hint = ""
-        if self.input_buf.startswith("/") and len(self.input_buf) > 0:
-            matches = [c for c in self.commands if c.startswith(self.input_buf)]
-            if matches and self.input_buf not in self.commands:
+        if self.input_buf.startswith("/"):
+            matches = self._command_hints.get(self.input_buf)
+            if matches and self.input_buf not in self._command_set:
                 cmd_hint = "  ".join(matches[:4])
         trimmed = self.input_buf.lstrip()
         if trimmed.lower().startswith("/model"):
             partial = trimmed[len("/model"):].strip().lower()
             filtered = (
-                [m for m in self.available_models if partial in m.lower()]
+                [m for m, low in zip(self.available_models, self._models_lower) if partial in low]
                 if partial
                 else self.available_models
             )
             model_hint = "models: " + ("  ".join(filtered) if filtered else "(none)")
 
-        if cmd_hint:
-            st = f" {cmd_hint}"
-            if model_hint:
-                st += f" | {model_hint}"
-            st += " "
-        elif model_hint:
-            st = f" {model_hint} "
+        # the bar only changes between turns or as the hint changes, so its
+        # bytes are kept for the last few distinct states
+        if cmd_hint or model_hint:
+            status_key: Tuple = (cmd_hint, model_hint, self.cols)
         else:
-            ctx_note = ""
-            if self.last_matches:
-                ctx_note = " | ctx:on" if self.show_ctx else " | ctx:off"
-            cost_str = f" | ${self.session_cost:.4f}" if self.session_cost > 0 else ""
-            tok_str = f" | {self.session_tokens}tok" if self.session_tokens > 0 else ""
-            st = f" {self.status}{ctx_note}{tok_str}{cost_str} "
-            if self.empty_state:
-                st += " * At your fingers rests the world's knowledge. What will you create?"
-
-        b += st[: self.cols].ljust(self.cols).encode()
-        b += ansi.reset()
-
-        # input
-        b += ansi.move(self.rows, 1)
-        b += ansi.clear_eol()
+            status_key = (
+                self.status,
+                self.show_ctx if self.last_matches else None,
+                self.session_tokens,
+                self.session_cost,
+                self.empty_state,
+                self.cols,
+            )
+        row = self._status_cache.get(status_key)
+        if row is None:
+            if cmd_hint:
+                st = f" {cmd_hint}"
+                if model_hint:
+                    st += f" | {model_hint}"
+                st += " "
+            elif model_hint:
+                st = f" {model_hint} "
+            else:
+                ctx_note = ""
+                if self.last_matches:
+                    ctx_note = " | ctx:on" if self.show_ctx else " | ctx:off"
+                cost_str = f" | ${self.session_cost:.4f}" if self.session_cost > 0 else ""
+                tok_str = f" | {self.session_tokens}tok" if self.session_tokens > 0 else ""
+                st = f" {self.status}{ctx_note}{tok_str}{cost_str} "
+                if self.empty_state:
+                    st += " * At your fingers rests the world's knowledge. What will you create?"
+            row = ansi.REV_ON + st[: self.cols].ljust(self.cols).encode() + ansi.RESET
+            if len(self._status_cache) >= STATUS_CACHE_SIZE:
+                self._status_cache.clear()
+            self._status_cache[status_key] = row
+        return row
+
+    def _input_bytes(self) -> bytes:
         prompt = "> " + self.input_buf
-        b += prompt[-self.cols :].encode(errors="ignore")
+        return prompt[-self.cols :].encode(errors="ignore")
 
-        b += ansi.show_cursor()
-        return bytes(b)
+    def render_parts(self, input_only: bool = False) -> List[bytes]:
+        """The next frame as a list of byte strings, ready for a gather write.
+
+        With input_only, only the input line (and the status bar, whose hints
+        follow it) is rebuilt and compared; use it when nothing else changed.
+        """
+        if self.mode == "splash":
+            return [self.render_splash()]
+        if self.no_ansi:
+            return [self.render_plain()]
+
+        prev = self._prev_frame
+        if input_only and prev and self._frame_cols == self.cols:
+            frame = prev[:-2]
+            frame.append(self._status_bytes())
+            frame.append(self._input_bytes())
+            rows = range(len(frame) - 2, len(frame))
+        else:
+            frame = self.build_frame()
+            rows = range(len(frame))
+        # First frame or a resize: nothing on screen can be trusted.
+        full = len(prev) != len(frame) or self._frame_cols != self.cols
+        # header and status are padded to the full width, so they never need CLEAR_EOL
+        padded = (0, len(frame) - 2)
+        move_col1 = ansi.move_col1
+
+        parts: List[bytes] = []
+        if full:
+            parts.append(ansi.CLEAR)
+        input_row = len(frame) - 1
+        above_input = full  # wrote a row other than the input line
+        for i in rows:
+            row = frame[i]
+            if full:
+                if row:
+                    parts.append(move_col1(i + 1))
+                    parts.append(row)
+                continue
+            old = prev[i]
+            if row == old:
+                continue
+            if i != input_row:
+                above_input = True
+            if i in padded:
+                parts.append(move_col1(i + 1))
+                parts.append(row)
+            elif row.isascii() and old.isascii():
+                # plain text: one byte per column, so rewrite only from the first change
+                same = len(commonprefix((old, row)))
+                parts.append(ansi.move(i + 1, same + 1))
+                parts.append(row[same:])
+                if len(row) < len(old):
+                    parts.append(ansi.CLEAR_EOL)
+            else:
+                parts.append(move_col1(i + 1))
+                parts.append(ansi.CLEAR_EOL)
+                parts.append(row)
+        self._prev_frame = frame
+        self._frame_cols = self.cols
+
+        if not parts:
+            return parts  # nothing changed; the cursor is still parked from last time
+
+        # park the cursor after the prompt, unless writing the input row (always
+        # the last row written) already left it there
+        prompt_len = min(len(self.input_buf) + 2, self.cols)
+        input_written = full or frame[-1] != prev[-1]
+        if not input_written or prompt_len >= self.cols:
+            parts.append(ansi.move(self.rows, prompt_len + 1 if prompt_len < self.cols else self.cols))
+        if above_input:
+            # keep the caret from trailing across the transcript while it is
+            # redrawn; a frame that only touches the input line leaves it be
+            parts.insert(0, ansi.HIDE_CURSOR)
+            parts.append(ansi.SHOW_CURSOR)
+        return parts
+
+    def render_dirty(self, full: bool = False) -> List[bytes]:
+        """render_parts() for whatever was marked dirty, clearing both flags.
+
+        Pass full after changing anything the flags do not track (the
+        transcript, status, model); only keystrokes set input_dirty.
+        """
+        input_only = not full and self.input_dirty and not self.dirty
+        parts = self.render_parts(input_only=input_only)
+        self.dirty = self.input_dirty = False
+        return parts
 
     def start_chat(self) -> None:
         name = self.splash_input.strip() or "Operator"
@@ -335,58 +635,116 @@ class UI:
         self.personalization_note = f"Operator name: {name}. When asked who the user is, answer with this name."
         self.personalization_sent = False
         self.mode = "chat"
-        self.lines.clear()
+        self.clear_lines()
         self.add_block(
             "SYS: ", f"Linked as {self.user_label}. Type /help for commands."
         )
         self.add_shortcut_grid()
         self.splash_input = ""
 
+# Words that suggest the question needs fresh information from the web.
+_WEB_TRIGGER_RE = re.compile(
+    r"\b(?:news|headline|latest|current|today|this week|breaking|update|search|find|lookup)\b",
+    re.IGNORECASE,
+)
+
+# Minimum gap between frames drawn for typing/scrolling (~120 fps). Much
+# shorter than refresh_ms so echo feels immediate, but a paste or key
+# repeat still collapses into a handful of frames.
+INPUT_FRAME_MS = 8
+# Bytes requested per TTY read: enough that a paste or key-repeat burst
+# arrives in one syscall.
+TTY_READ_SIZE = 4096
+
+# Escape-sequence parser states for the input loop
+_KEY_NORMAL, _KEY_ESC, _KEY_CSI = range(3)
+# Seconds to wait after ESC before treating it as a lone keypress
+ESC_TIMEOUT = 0.1
+
+# What the input loop does with a byte outside an escape sequence
+_BYTE_OTHER, _BYTE_PRINTABLE, _BYTE_ENTER, _BYTE_BACKSPACE, _BYTE_ESC, _BYTE_KILL = range(6)
+
+
+def _build_byte_classes() -> bytes:
+    table = bytearray(256)  # _BYTE_OTHER
+    table[32:127] = bytes([_BYTE_PRINTABLE]) * 95
+    table[10] = table[13] = _BYTE_ENTER
+    table[8] = table[127] = _BYTE_BACKSPACE
+    table[27] = _BYTE_ESC
+    table[21] = _BYTE_KILL  # Ctrl+U
+    return bytes(table)
+
+
+_BYTE_CLASS = _build_byte_classes()
+
+# Streamed characters worth a redraw before the 2 x refresh_ms fallback
+STREAM_MIN_CHARS = 4
+
+_STREAM_END = object()  # queued by the stream worker after the last event
+
+
+def _type_ahead(ui: UI, data: bytes) -> bytes:
+    """Apply the line-editing keys in data to the prompt while a reply streams.
+
+    Stops at the first Enter or ESC and returns the bytes from there on;
+    they wait in ui.typeahead until the reply is done. Other control bytes
+    are ignored.
+    """
+    for i, c in enumerate(data):
+        kind = _BYTE_CLASS[c]
+        if kind == _BYTE_ENTER or kind == _BYTE_ESC:
+            return data[i:]
+        if kind == _BYTE_PRINTABLE:
+            ui.input_buf += chr(c)
+        elif kind == _BYTE_BACKSPACE:
+            ui.input_buf = ui.input_buf[:-1]
+        elif kind == _BYTE_KILL:
+            ui.input_buf = ""
+        else:
+            continue
+        ui.input_dirty = True
+    return b""
+
 
 def do_stream(
     ui: UI,
     llm: OpenAIClient,
     fd: int,
+    selector: selectors.BaseSelector,
     system_prompt: str,
     preset_text: str,
     user_msg: str,
-    kb,
+    kb: Dict[str, str],
     web_search: bool = False,
 ) -> None:
     """Handle streaming a response with ESC interrupt, citations, and token tracking."""
-    from .ttyio import read_bytes, write_bytes
+    from .ttyio import read_bytes, writev_bytes
+
+    last_flush_ns = 0
+    input_frame_ns = INPUT_FRAME_MS * 1_000_000
 
-    def flush() -> None:
-        write_bytes(fd, ui.render())
+    def flush(full: bool = True) -> None:
+        nonlocal last_flush_ns
+        writev_bytes(fd, ui.render_dirty(full))
+        last_flush_ns = time.monotonic_ns()
 
+    # keys that were already buffered when Enter was handled come first
+    ui.typeahead = _type_ahead(ui, ui.typeahead)
     ui.status = "Thinking…"
     flush()
 
-    out: List[str] = []
-    start = time.time()
-    matches = find_matches(kb, user_msg)
-    ui.last_matches = [m[0] for m in matches]
-    retrieval_context = format_context(matches) if ui.show_ctx else ""
+    out = io.StringIO()  # the whole reply, read back once at the end
+    fresh: List[str] = []  # chunks received since the last redraw
+    fresh_len = 0
+    start_ns = time.monotonic_ns()
+    match_keys, context = retrieve(kb, user_msg)
+    ui.last_matches = list(match_keys)
+    retrieval_context = context if ui.show_ctx else ""
 
     # Auto-enable web search for news/current queries unless explicitly overridden
     needs_web = web_search
-    if not needs_web:
-        text_l = user_msg.lower()
-        web_triggers = [
-            "news",
-            "headline",
-            "latest",
-            "current",
-            "today",
-            "this week",
-            "breaking",
-            "update",
-            "search",
-            "find",
-            "lookup",
-        ]
-        if any(t in text_l for t in web_triggers):
-            needs_web = True
+    if not needs_web and _WEB_TRIGGER_RE.search(user_msg):
+        needs_web = True
 
     system_block_parts = [system_prompt, preset_text]
     if not ui.personalization_sent and ui.personalization_note:
@@ -407,38 +765,128 @@ def do_stream(
     # Add user message to history
     ui.add_to_history("user", user_msg)
 
-    stream = llm.stream(model=ui.model, input_payload=payload, web_search=needs_web)
+    # this reply's own handle: ESC reaches it even while the request is in
+    # flight, and an abandoned earlier reply cannot take it over
+    cancel = StreamCancel()
+    stream = llm.stream(model=ui.model, input_payload=payload, web_search=needs_web, cancel=cancel)
 
-    ai_block_start = len(ui.lines)
-    last_render = time.time()
+    ui.begin_stream("AI: ")
+    refresh_ns = ui.refresh_ms * 1_000_000
+    last_render_ns = time.monotonic_ns()
     ui.interrupted = False
     final_result: StreamResult | None = None
 
-    for event in stream:
-        # Check for ESC key (non-blocking)
-        r, _, _ = select.select([fd], [], [], 0)
-        if r:
-            ch = read_bytes(fd, 1)
-            if ch and ch[0] == 27:  # ESC
-                ui.interrupted = True
-                out.append(" [interrupted]")
-                break
-
-        if isinstance(event, str):
-            out.append(event)
-            if time.time() - last_render > ui.refresh_ms / 1000.0:
-                del ui.lines[ai_block_start:]
-                ui.add_block("AI: ", "".join(out))
-                ui.status = "Streaming… (ESC to stop)"
-                flush()
-                last_render = time.time()
-        elif isinstance(event, StreamResult):
-            final_result = event
+    # The network side runs on a worker thread so the UI thread can sleep on
+    # the TTY: ESC is seen as soon as it arrives, not after the next token.
+    events: "queue.SimpleQueue[object]" = queue.SimpleQueue()  # C queue: no Condition or task bookkeeping per token
+    stop = threading.Event()
+    wake_r, wake_w = os.pipe()  # lets the worker cut the UI thread's wait short
+    selector.register(wake_r, selectors.EVENT_READ)
+
+    def put(event: object) -> None:
+        events.put(event)
+        # only the event that finds the queue empty needs to wake the UI
+        # thread; it drains everything queued behind it in the same pass
+        if events.qsize() == 1:
+            try:
+                os.write(wake_w, b"\0")
+            except OSError:
+                pass  # the UI thread has stopped listening
+
+    def produce() -> None:
+        try:
+            for event in stream:
+                put(event)
+                if stop.is_set():
+                    break
+        except Exception as exc:  # re-raised on the UI thread
+            put(exc)
+        finally:
+            put(_STREAM_END)
+            os.close(wake_w)
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    done = False
+    try:
+        while not done:
+            if ui.dirty or ui.input_dirty:
+                # typing is waiting on the frame budget
+                wait = max(0, last_flush_ns + input_frame_ns - time.monotonic_ns()) / 1_000_000_000
+            elif fresh:
+                # text is held back until the refresh interval is up
+                hold_ns = refresh_ns if fresh_len >= STREAM_MIN_CHARS else 2 * refresh_ns
+                wait = max(0, last_render_ns + hold_ns - time.monotonic_ns()) / 1_000_000_000
+            else:
+                wait = None  # sleep until a key or the worker wakes us
+            ready = selector.select(wait)
+            if any(key.fd == wake_r for key, _ in ready):
+                os.read(wake_r, 4096)
+            if any(key.fd == fd for key, _ in ready):
+                data = read_bytes(fd, TTY_READ_SIZE)
+                if 27 in data:  # ESC
+                    ui.interrupted = True
+                    out.write(" [interrupted]")
+                    stop.set()
+                    # drop the connection rather than let the worker wait for the next event
+                    try:
+                        cancel.cancel()
+                    except Exception:
+                        pass  # the worker is abandoned either way; stop is set
+                    break
+                if ui.typeahead:
+                    ui.typeahead += data  # queue behind what is already waiting
+                    continue
+                ui.typeahead = _type_ahead(ui, data)
+                if ui.typeahead:
+                    ui.status = "Streaming… (input queued, ESC to stop)"
+                    ui.dirty = True
+
+            # take everything that arrived during the wait
+            while True:
+                try:
+                    event = events.get_nowait()
+                except queue.Empty:
+                    break
+                if event is _STREAM_END:
+                    done = True
+                    break
+                if isinstance(event, Exception):
+                    raise event
+                if isinstance(event, str):
+                    out.write(event)
+                    fresh.append(event)
+                    fresh_len += len(event)
+                elif isinstance(event, StreamResult):
+                    final_result = event
+
+            # a chunk or two of a few characters rarely changes what is on
+            # screen; let it ride until there is more or the wait gets long
+            now = time.monotonic_ns()
+            since = now - last_render_ns
+            if fresh and since >= refresh_ns and (
+                fresh_len >= STREAM_MIN_CHARS or since >= 2 * refresh_ns
+            ):
+                ui.stream_text("".join(fresh))
+                fresh.clear()
+                fresh_len = 0
+                ui.status = (
+                    "Streaming… (input queued, ESC to stop)" if ui.typeahead
+                    else "Streaming… (ESC to stop)"
+                )
+                ui.dirty = True
+                last_render_ns = now
+            # streamed text and typing that are due together go out as one write
+            if (ui.dirty or ui.input_dirty) and now - last_flush_ns >= input_frame_ns:
+                flush(full=False)
+    finally:
+        selector.unregister(wake_r)
+        os.close(wake_r)
 
     # Final render
-    elapsed_ms = int((time.time() - start) * 1000)
-    response_text = "".join(out).strip()
-    del ui.lines[ai_block_start:]
+    elapsed_ms = (time.monotonic_ns() - start_ns) // 1_000_000
+    response_text = out.getvalue().strip()
+    ui.end_stream()
     ui.add_block("AI: ", response_text)
 
     # Add AI response to history
@@ -462,6 +910,166 @@ def do_stream(
     flush()
 
 
+@dataclass
+class Session:
+    """What command handlers need besides the UI."""
+
+    fd: int
+    selector: selectors.BaseSelector  # registered for fd; do_stream adds its wake pipe
+    llm: OpenAIClient
+    system_prompt: str
+    presets: Dict[str, str]
+    preset_text: str
+    kb: Dict[str, str]
+
+
+# Command handlers take (ui, session, argv) and return None when they only
+# changed the transcript, STREAMED when do_stream already drew the result,
+# or QUIT to leave the app.
+QUIT = "quit"
+STREAMED = "streamed"
+
+
+def _cmd_quit(ui: UI, session: Session, cmd: List[str]) -> str | None:
+    return QUIT
+
+
+def _cmd_clear(ui: UI, session: Session, cmd: List[str]) -> str | None:
+    ui.clear_lines()
+    ui.add_block("SYS: ", "Cleared.")
+    ui.empty_state = False
+    return None
+
+
+def _cmd_help(ui: UI, session: Session, cmd: List[str]) -> str | None:
+    ui.add_block(
+        "SYS: ",
+        "Commands: /help /new /clear /quit /preset [name] /model [name] /ctx /tutorial /search [query] | ESC to stop",
+    )
+    return None
+
+
+def _cmd_new(ui: UI, session: Session, cmd: List[str]) -> str | None:
+    ui.clear_history()
+    ui.clear_lines()
+    ui.add_block("SYS: ", "New conversation started.")
+    ui.personalization_sent = False
+    ui.add_shortcut_grid()
+    return None
+
+
+def _cmd_preset(ui: UI, session: Session, cmd: List[str]) -> str | None:
+    presets = session.presets
+    if len(cmd) == 1:
+        names = ", ".join(presets.keys()) if presets else "(none)"
+        ui.add_block("SYS: ", f"Presets: {names}")
+    else:
+        name = cmd[1]
+        if name in presets:
+            ui.preset = name
+            session.preset_text = presets[name]
+            ui.add_block("SYS: ", f"Preset set to {name}")
+        else:
+            ui.add_block("SYS: ", f"Unknown preset: {name}")
+    return None
+
+
+def _cmd_model(ui: UI, session: Session, cmd: List[str]) -> str | None:
+    if len(cmd) == 1:
+        models = ", ".join(ui.available_models)
+        ui.add_block("SYS: ", f"Current model: {ui.model} | Available: {models}")
+    else:
+        name = " ".join(cmd[1:])
+        ui.model = name
+        ui.add_model(name)
+        ui.add_block("SYS: ", f"Model set to {name}")
+    return None
+
+
+def _cmd_ctx(ui: UI, session: Session, cmd: List[str]) -> str | None:
+    ui.show_ctx = not ui.show_ctx
+    state = "on" if ui.show_ctx else "off"
+    ui.add_block("SYS: ", f"Retrieval context {state}")
+    return None
+
+
+def _cmd_tutorial(ui: UI, session: Session, cmd: List[str]) -> str | None:
+    # Use the tutorial preset for this message
+    tutorial_prompt = session.presets.get("tutorial", "Explain this system.")
+    do_stream(
+        ui,
+        session.llm,
+        session.fd,
+        session.selector,
+        session.system_prompt,
+        tutorial_prompt,
+        "Give me a complete tutorial of ADDS AI.",
+        session.kb,
+        web_search=False,
+    )
+    return STREAMED
+
+
+def _cmd_search(ui: UI, session: Session, cmd: List[str]) -> str | None:
+    query = " ".join(cmd[1:]) if len(cmd) > 1 else ""
+    if not query:
+        ui.add_block("SYS: ", "Usage: /search <query>")
+        return None
+    ui.add_block(ui.user_prefix(), f"[search] {query}")
+    do_stream(
+        ui,
+        session.llm,
+        session.fd,
+        session.selector,
+        session.system_prompt,
+        session.preset_text,
+        query,
+        session.kb,
+        web_search=True,
+    )
+    return STREAMED
+
+
+def _shortcut_search(ui: UI, session: Session, cmd: List[str]) -> str | None:
+    ui.add_block("SYS: ", "Shortcut: /search <topic>. Type your query after /search.")
+    ui.input_buf = "/search "
+    return None
+
+
+def _shortcut_models(ui: UI, session: Session, cmd: List[str]) -> str | None:
+    models = ", ".join(ui.available_models)
+    ui.add_block("SYS: ", f"Models: {models}. Set with /model <id>.")
+    ui.input_buf = "/model "
+    return None
+
+
+def _cmd_unknown(ui: UI, session: Session, cmd: List[str]) -> str | None:
+    ui.add_block("SYS: ", f"Unknown: {cmd[0]}")
+    return None
+
+
+COMMANDS: Dict[str, Callable[[UI, Session, List[str]], str | None]] = {
+    "/q": _cmd_quit,
+    "/quit": _cmd_quit,
+    "/clear": _cmd_clear,
+    "/help": _cmd_help,
+    "/new": _cmd_new,
+    "/preset": _cmd_preset,
+    "/model": _cmd_model,
+    "/ctx": _cmd_ctx,
+    "/tutorial": _cmd_tutorial,
+    "/search": _cmd_search,
+}
+
+# the shortcut grid; these match only the whole line, so "/2 foo" is unknown
+SHORTCUTS: Dict[str, Callable[[UI, Session, List[str]], str | None]] = {
+    "/1": _shortcut_search,
+    "/2": _cmd_ctx,
+    "/3": _cmd_tutorial,
+    "/4": _shortcut_models,
+}
+
+
 def parse_args():
     env = load_config()
     ap = argparse.ArgumentParser()
@@ -483,6 +1091,10 @@ def main():
     args, env = parse_args()
 
     fd = open_tty(args.tty)
+    # Frames no longer toggle the cursor; put the terminal back in a sane
+    # state once on the way out, including when systemd stops us.
+    atexit.register(write_bytes, fd, ansi.RESET + ansi.SHOW_CURSOR)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     presets = load_presets()
     preset_name, preset_text = select_preset(presets, args.preset)
     system_prompt = load_system_prompt()
@@ -497,24 +1109,119 @@ def main():
     )
 
     llm = OpenAIClient()
-    write_bytes(fd, ui.render())
-
-    def flush() -> None:
-        write_bytes(fd, ui.render())
+    # one epoll/kqueue registration for the TTY, shared by the input loop and do_stream
+    selector = selectors.DefaultSelector()
+    selector.register(fd, selectors.EVENT_READ)
+    session = Session(
+        fd=fd,
+        selector=selector,
+        llm=llm,
+        system_prompt=system_prompt,
+        presets=presets,
+        preset_text=preset_text,
+        kb=kb,
+    )
+    writev_bytes(fd, ui.render_parts())
+
+    # bytes read from the TTY but not yet dispatched: buf[pos:]
+    buf = b""
+    pos = 0
+    key_state = _KEY_NORMAL
+    min_flush_ns = INPUT_FRAME_MS * 1_000_000
+    last_flush_ns = 0
+
+    def flush(full: bool = True) -> None:
+        nonlocal last_flush_ns
+        writev_bytes(fd, ui.render_dirty(full))
+        last_flush_ns = time.monotonic_ns()
+
+    def maybe_flush() -> float | None:
+        """Flush a dirty screen if the frame budget allows; return how long to wait for input.
+
+        None means there is nothing left to draw, so the wait can block until a key arrives.
+        """
+        if not (ui.dirty or ui.input_dirty):
+            return None
+        wait_ns = last_flush_ns + min_flush_ns - time.monotonic_ns()
+        if wait_ns > 0:
+            return wait_ns / 1_000_000_000
+        flush(full=False)
+        return None
+
+    def next_byte(timeout: float | None) -> int | None:
+        """Next input byte; drains everything the kernel has in one read when the buffer runs dry."""
+        nonlocal buf, pos
+        if pos >= len(buf):
+            data = read_bytes(fd, TTY_READ_SIZE)
+            if not data:
+                # nothing buffered in the kernel either: sleep until there is
+                if not selector.select(timeout):
+                    return None
+                data = read_bytes(fd, TTY_READ_SIZE)
+                if not data:
+                    return None
+            buf, pos = data, 0
+        pos += 1
+        return buf[pos - 1]
 
     while True:
-        # non-blocking read with select
-        r, _, _ = select.select([fd], [], [], 0.1)
-        if not r:
+        if ui.typeahead:
+            # keys held back during a reply, in the order they were typed
+            buf, pos = ui.typeahead, 0
+            ui.typeahead = b""
+        # render at most once per batch of input, and no faster than INPUT_FRAME_MS
+        if pos < len(buf):
+            timeout = 0.0  # the byte is already buffered
+        else:
+            timeout = maybe_flush()
+            if key_state != _KEY_NORMAL:
+                # give the rest of an escape sequence ESC_TIMEOUT to arrive
+                timeout = ESC_TIMEOUT
+
+        c = next_byte(timeout)
+        if c is None:
+            # nothing followed within ESC_TIMEOUT: it was a lone ESC
+            # keypress, which the input line ignores
+            key_state = _KEY_NORMAL
             continue
-        ch = read_bytes(fd, 1)
-        if not ch:
+
+        # Escape sequences (arrows, scroll). The bytes of a sequence arrive
+        # in one read, so they are parsed straight out of the buffer.
+        if key_state == _KEY_ESC:
+            if c in (91, 79):  # '[' or 'O'
+                key_state = _KEY_CSI
+                continue
+            # lone ESC followed by an ordinary key: drop the ESC, keep the key
+            key_state = _KEY_NORMAL
+        elif key_state == _KEY_CSI:
+            if not 0x40 <= c <= 0x7E:
+                continue  # parameter/intermediate bytes, e.g. "1;5" in ESC[1;5A
+            key_state = _KEY_NORMAL
+            if c == 65:  # Up arrow
+                ui.scroll_offset = min(
+                    ui.scroll_offset + 1,
+                    max(ui.transcript_len() - ui.viewport_height(), 0),
+                )
+                ui.dirty = True
+            elif c == 66:  # Down arrow
+                ui.scroll_offset = max(ui.scroll_offset - 1, 0)
+                ui.dirty = True
             continue
 
-        c = ch[0]
+        kind = _BYTE_CLASS[c]
+
+        # printable ASCII: by far the most common byte, so it is tested first
+        if kind == _BYTE_PRINTABLE:
+            if ui.mode == "splash":
+                if len(ui.splash_input) < ui.splash_input_limit:
+                    ui.splash_input += chr(c)
+            else:
+                ui.input_buf += chr(c)
+            ui.input_dirty = True
+            continue
 
         # Enter
-        if c in (10, 13):
+        if kind == _BYTE_ENTER:
             if ui.mode == "splash":
                 line = ui.splash_input.strip()
                 if line in ("/q", "/quit"):
@@ -528,124 +1235,21 @@ def main():
             if not line:
                 flush()
                 continue
+            # whatever is still buffered was typed after this Enter; a reply
+            # that streams now takes it over so later keys queue behind it
+            ui.typeahead, buf, pos = buf[pos:], b"", 0
 
             # commands
             if line.startswith("/"):
                 ui.clear_empty_state()
                 cmd = line.split()
-
-                # Shortcut grid commands
-                if line in ui.shortcuts:
-                    if line == "/1":
-                        ui.add_block("SYS: ", "Shortcut: /search <topic>. Type your query after /search.")
-                        ui.input_buf = "/search "
-                        flush()
-                        continue
-                    if line == "/2":
-                        ui.show_ctx = not ui.show_ctx
-                        state = "on" if ui.show_ctx else "off"
-                        ui.add_block("SYS: ", f"Retrieval context {state}")
-                        ui.status = "Idle"
-                        flush()
-                        continue
-                    if line == "/3":
-                        tutorial_prompt = presets.get("tutorial", "Explain this system.")
-                        do_stream(
-                            ui,
-                            llm,
-                            fd,
-                            system_prompt,
-                            tutorial_prompt,
-                            "Give me a complete tutorial of ADDS AI.",
-                            kb,
-                            web_search=False,
-                        )
-                        continue
-                    if line == "/4":
-                        models = ", ".join(ui.available_models)
-                        ui.add_block("SYS: ", f"Models: {models}. Set with /model <id>.")
-                        ui.input_buf = "/model "
-                        flush()
-                        continue
-
-                if cmd[0] in ("/q", "/quit"):
+                handler = SHORTCUTS.get(line) or COMMANDS.get(cmd[0], _cmd_unknown)
+                result = handler(ui, session, cmd)
+                if result == QUIT:
                     return
-                if cmd[0] == "/clear":
-                    ui.lines.clear()
-                    ui.add_block("SYS: ", "Cleared.")
-                    ui.empty_state = False
-                elif cmd[0] == "/help":
-                    ui.add_block(
-                        "SYS: ",
-                        "Commands: /help /new /clear /quit /preset [name] /model [name] /ctx /tutorial /search [query] | ESC to stop",
-                    )
-                elif cmd[0] == "/new":
-                    ui.clear_history()
-                    ui.lines.clear()
-                    ui.add_block("SYS: ", "New conversation started.")
-                    ui.personalization_sent = False
-                    ui.add_shortcut_grid()
-                elif cmd[0] == "/preset":
-                    if len(cmd) == 1:
-                        names = ", ".join(presets.keys()) if presets else "(none)"
-                        ui.add_block("SYS: ", f"Presets: {names}")
-                    else:
-                        name = cmd[1]
-                        if name in presets:
-                            ui.preset = name
-                            preset_text = presets[name]
-                            ui.add_block("SYS: ", f"Preset set to {name}")
-                        else:
-                            ui.add_block("SYS: ", f"Unknown preset: {name}")
-                elif cmd[0] == "/model":
-                    if len(cmd) == 1:
-                        models = ", ".join(ui.available_models)
-                        ui.add_block("SYS: ", f"Current model: {ui.model} | Available: {models}")
-                    else:
-                        name = " ".join(cmd[1:])
-                        ui.model = name
-                        if name not in ui.available_models:
-                            ui.available_models.append(name)
-                        ui.add_block("SYS: ", f"Model set to {name}")
-                elif cmd[0] == "/ctx":
-                    ui.show_ctx = not ui.show_ctx
-                    state = "on" if ui.show_ctx else "off"
-                    ui.add_block("SYS: ", f"Retrieval context {state}")
-                elif cmd[0] == "/tutorial":
-                    # Use the tutorial preset for this message
-                    tutorial_prompt = presets.get("tutorial", "Explain this system.")
-                    do_stream(
-                        ui,
-                        llm,
-                        fd,
-                        system_prompt,
-                        tutorial_prompt,
-                        "Give me a complete tutorial of ADDS AI.",
-                        kb,
-                        web_search=False,
-                    )
-                    continue
-                elif cmd[0] == "/search":
-                    query = " ".join(cmd[1:]) if len(cmd) > 1 else ""
-                    if not query:
-                        ui.add_block("SYS: ", "Usage: /search <query>")
-                    else:
-                        ui.add_block(ui.user_prefix(), f"[search] {query}")
-                        do_stream(
-                            ui,
-                            llm,
-                            fd,
-                            system_prompt,
-                            preset_text,
-                            query,
-                            kb,
-                            web_search=True,
-                        )
-                        continue
-                else:
-                    ui.add_block("SYS: ", f"Unknown: {cmd[0]}")
-                ui.status = "Idle"
-                flush()
+                if result != STREAMED:
+                    ui.status = "Idle"
+                    flush()
                 continue
 
             # normal chat
@@ -653,78 +1257,42 @@ def main():
             ui.empty_state = False
             ui.add_block(ui.user_prefix(), line)
             do_stream(
-                ui, llm, fd, system_prompt, preset_text, line, kb, web_search=False
+                ui,
+                llm,
+                fd,
+                selector,
+                system_prompt,
+                session.preset_text,
+                line,
+                kb,
+                web_search=False,
             )
             continue
 
-        # Backspace / DEL (handle multiple codes)
-        if c in (8, 127, 0x08, 0x7F):
+        # Backspace / DEL
+        if kind == _BYTE_BACKSPACE:
             if ui.mode == "splash":
                 ui.splash_input = ui.splash_input[:-1]
             else:
                 ui.input_buf = ui.input_buf[:-1]
-            flush()
+            ui.input_dirty = True
             continue
 
-        # ESC - handle escape sequences (arrows, scroll, etc.)
-        if c == 27:
-            height = ui.viewport_height()
-            r2, _, _ = select.select([fd], [], [], 0.05)
-            if r2:
-                seq = read_bytes(fd, 1)
-                if seq and seq[0] in (91, 79):  # '[' or 'O'
-                    r3, _, _ = select.select([fd], [], [], 0.05)
-                    if r3:
-                        end = read_bytes(fd, 1)
-                        if end:
-                            if end[0] == 65:  # Up arrow
-                                ui.scroll_offset = min(
-                                    ui.scroll_offset + 1,
-                                    max(len(ui.lines) - height, 0),
-                                )
-                                flush()
-                            elif end[0] == 66:  # Down arrow
-                                ui.scroll_offset = max(ui.scroll_offset - 1, 0)
-                                flush()
-            # ESC alone or unhandled sequence - ignore
-            continue
-
-        # Filter out escape sequence fragments that leaked through
-        # (common when scrolling fast - [A, [B, [C, [D, etc.)
-        if c == 91:  # '[' character
-            # Check if next char is a letter (escape sequence fragment)
-            r2, _, _ = select.select([fd], [], [], 0.02)
-            if r2:
-                next_ch = read_bytes(fd, 1)
-                if next_ch and (65 <= next_ch[0] <= 90 or 97 <= next_ch[0] <= 122):
-                    # It's an escape fragment like [A - discard both
-                    continue
-                # Not a fragment, but we consumed a char - need to handle it
-                # For now, just skip the '[' and let the next char be processed normally
-                # This means '[' followed by non-letter is also discarded
+        # ESC starts a sequence; the parser states above consume the rest
+        if kind == _BYTE_ESC:
+            key_state = _KEY_ESC
             continue
 
         # Ctrl+U - clear input
-        if c == 21:
+        if kind == _BYTE_KILL:
             if ui.mode == "splash":
                 ui.splash_input = ""
             else:
                 ui.input_buf = ""
-            flush()
+            ui.input_dirty = True
             continue
 
-        # Ignore other control characters
-        if c < 32:
-            continue
-
-        # printable ASCII only
-        if 32 <= c <= 126:
-            if ui.mode == "splash":
-                if len(ui.splash_input) < ui.splash_input_limit:
-                    ui.splash_input += chr(c)
-            else:
-                ui.input_buf += chr(c)
-            flush()
+        # other control characters and non-ASCII bytes are ignored
 
 
 if __name__ == "__main__":
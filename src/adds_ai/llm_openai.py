@@ -1,7 +1,17 @@
+import importlib.util
+import socket
+import threading
 from dataclasses import dataclass, field
-from typing import Generator, Iterable, List, Mapping, Optional
+from typing import Generator, List, Mapping, Optional, Sequence
 
-from openai import OpenAI
+import httpx
+from openai import DefaultHttpxClient, OpenAI
+
+# HTTP/2 needs the optional h2 package (pip install "adds-ai-terminal[http2]")
+_HTTP2 = importlib.util.find_spec("h2") is not None
+# Turns are minutes apart at a terminal; keep the connection warm across them so
+# a new question does not pay for a fresh TCP + TLS handshake.
+_LIMITS = httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=300.0)
 
 # Pricing per 1M tokens (as of late 2024)
 MODEL_PRICING = {
@@ -11,6 +21,10 @@ MODEL_PRICING = {
     "gpt-3.5-turbo": {"input": 0.50, "output": 1.50},
 }
 
+# (input, output) USD per token, for _calculate_cost
+_PER_TOKEN = {m: (p["input"] / 1_000_000, p["output"] / 1_000_000) for m, p in MODEL_PRICING.items()}
+_DEFAULT_PER_TOKEN = _PER_TOKEN["gpt-4o-mini"]
+
 
 @dataclass
 class StreamResult:
@@ -22,66 +36,125 @@ class StreamResult:
     cost_usd: float = 0.0
 
 
+class StreamCancel:
+    """Cancel handle for one call to OpenAIClient.stream().
+
+    cancel() may be called from any thread, before or after the request
+    has been answered. A stream cancelled while its request was still in
+    flight is closed as soon as the response arrives.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stream = None
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            stream = self._stream
+        if stream is not None:
+            _abort(stream)
+
+    def _attach(self, stream) -> bool:
+        """Remember the response stream; False if it was cancelled already."""
+        with self._lock:
+            if self.cancelled:
+                return False
+            self._stream = stream
+            return True
+
+
 class OpenAIClient:
     def __init__(self):
-        self.client = OpenAI()
+        self.client = OpenAI(http_client=DefaultHttpxClient(http2=_HTTP2, limits=_LIMITS))
         self.session_tokens = 0
         self.session_cost = 0.0
 
     def _calculate_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
-        pricing = MODEL_PRICING.get(model, MODEL_PRICING.get("gpt-4o-mini"))
-        input_cost = (input_tokens / 1_000_000) * pricing["input"]
-        output_cost = (output_tokens / 1_000_000) * pricing["output"]
-        return input_cost + output_cost
+        input_rate, output_rate = _PER_TOKEN.get(model, _DEFAULT_PER_TOKEN)
+        return input_tokens * input_rate + output_tokens * output_rate
 
     def stream(
         self,
         model: str,
-        input_payload: Iterable[Mapping[str, str]],
+        input_payload: Sequence[Mapping[str, str]],  # a concrete list; sent as-is
         web_search: bool = False,
+        cancel: Optional[StreamCancel] = None,
     ) -> Generator[str | StreamResult, None, None]:
         tools = [{"type": "web_search_preview"}] if web_search else []
 
         stream = self.client.responses.create(
             model=model,
-            input=list(input_payload),
+            input=input_payload,
             tools=tools if tools else None,
             stream=True,
         )
+        if cancel is not None and not cancel._attach(stream):
+            stream.close()  # cancelled while the request was in flight
+            return
 
         result = StreamResult()
         citations = []
+        seen_urls = set()
 
-        for event in stream:
-            event_type = getattr(event, "type", None)
-
-            if event_type == "response.output_text.delta":
-                result.text += event.delta
-                yield event.delta
-
-            # Collect citations from web search
-            elif event_type == "response.output_text.annotation.added":
-                ann = getattr(event, "annotation", None)
-                if ann and getattr(ann, "type", None) == "url_citation":
-                    url = getattr(ann, "url", "")
-                    title = getattr(ann, "title", url)
-                    if url and url not in [c.split(" - ")[0] for c in citations]:
-                        citations.append(f"{url} - {title}")
-
-            # Capture usage stats at the end
-            elif event_type == "response.completed":
-                resp = getattr(event, "response", None)
-                if resp:
-                    usage = getattr(resp, "usage", None)
-                    if usage:
-                        result.input_tokens = getattr(usage, "input_tokens", 0)
-                        result.output_tokens = getattr(usage, "output_tokens", 0)
-                        result.total_tokens = getattr(usage, "total_tokens", 0)
-                        result.cost_usd = self._calculate_cost(
-                            model, result.input_tokens, result.output_tokens
-                        )
-                        self.session_tokens += result.total_tokens
-                        self.session_cost += result.cost_usd
+        with stream:
+            for event in stream:
+                event_type = getattr(event, "type", None)
+
+                if event_type == "response.output_text.delta":
+                    result.text += event.delta
+                    yield event.delta
+
+                # Collect citations from web search
+                elif event_type == "response.output_text.annotation.added":
+                    ann = getattr(event, "annotation", None)
+                    if ann and getattr(ann, "type", None) == "url_citation":
+                        url = getattr(ann, "url", "")
+                        title = getattr(ann, "title", url)
+                        if url and url not in seen_urls:
+                            seen_urls.add(url)
+                            citations.append(f"{url} - {title}")
+
+                # Capture usage stats at the end
+                elif event_type == "response.completed":
+                    resp = getattr(event, "response", None)
+                    if resp:
+                        usage = getattr(resp, "usage", None)
+                        if usage:
+                            result.input_tokens = getattr(usage, "input_tokens", 0)
+                            result.output_tokens = getattr(usage, "output_tokens", 0)
+                            result.total_tokens = getattr(usage, "total_tokens", 0)
+                            result.cost_usd = self._calculate_cost(
+                                model, result.input_tokens, result.output_tokens
+                            )
+                            self.session_tokens += result.total_tokens
+                            self.session_cost += result.cost_usd
 
         result.citations = citations
         yield result
+
+
+def _abort(stream) -> None:
+    """Close a response stream from another thread than the one reading it.
+
+    Closing the response alone does not wake a recv() already blocked on
+    the reading thread, so the socket is shut down first; the reader then
+    fails at once instead of waiting for the next chunk.
+    """
+    sock = _response_socket(stream)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    stream.close()
+
+
+def _response_socket(stream) -> Optional[socket.socket]:
+    """The socket under a streaming response, when the transport exposes it."""
+    response = getattr(stream, "response", None)
+    network_stream = response.extensions.get("network_stream") if response is not None else None
+    if network_stream is None:
+        return None
+    return network_stream.get_extra_info("socket")
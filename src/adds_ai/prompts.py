@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Tuple
 
@@ -6,21 +7,41 @@ import yaml
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
+# libyaml's parser when PyYAML was built with it, the pure-Python one otherwise
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 def load_system_prompt(path: Path | None = None) -> str:
     p = path or DATA_DIR / "system_prompt.txt"
     try:
-        return p.read_text(encoding="utf-8").strip()
+        mtime_ns = p.stat().st_mtime_ns
+    except FileNotFoundError:
+        return ""
+    return _read_system_prompt(str(p), mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _read_system_prompt(path: str, mtime_ns: int) -> str:
+    try:
+        return Path(path).read_text(encoding="utf-8").strip()
     except FileNotFoundError:
         return ""
 
 
 def load_presets(path: Path | None = None) -> Dict[str, str]:
+    """Preset prompts by name; parsed once per file version, so treat the result as read-only."""
     p = path or DATA_DIR / "presets.yaml"
-    if not p.exists():
+    try:
+        mtime_ns = p.stat().st_mtime_ns
+    except FileNotFoundError:
         return {}
-    with p.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+    return _parse_presets(str(p), mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _parse_presets(path: str, mtime_ns: int) -> Dict[str, str]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_YAML_LOADER) or {}
     presets: Dict[str, str] = {}
     for key, val in data.items():
         if isinstance(val, dict) and "prompt" in val:
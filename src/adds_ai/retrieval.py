@@ -1,20 +1,37 @@
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple
 
 import yaml
 
+try:  # optional: pip install "adds-ai-terminal[fast]"
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
+# libyaml's parser when PyYAML was built with it, the pure-Python one otherwise
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 MAX_MATCHES = 3
 MAX_CHARS = 800
 
 
 def load_kb(path: Path | None = None) -> Dict[str, str]:
+    """Keyword -> blurb; parsed once per file version, so treat the result as read-only."""
     p = path or DATA_DIR / "kb.yaml"
-    if not p.exists():
+    try:
+        mtime_ns = p.stat().st_mtime_ns
+    except FileNotFoundError:
         return {}
-    with p.open("r", encoding="utf-8") as f:
-        raw = yaml.safe_load(f) or {}
+    return _parse_kb(str(p), mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _parse_kb(path: str, mtime_ns: int) -> Dict[str, str]:
+    with open(path, "r", encoding="utf-8") as f:
+        raw = yaml.load(f, Loader=_YAML_LOADER) or {}
     kb: Dict[str, str] = {}
     for key, val in raw.items():
         if isinstance(val, dict) and "blurb" in val:
@@ -22,14 +39,33 @@ def load_kb(path: Path | None = None) -> Dict[str, str]:
     return kb
 
 
+@lru_cache(maxsize=8)
+def _automaton(items: Tuple[Tuple[str, str], ...]):
+    """Automaton over the lower-cased keywords; keyed on the kb's contents, so an edited kb gets a new one."""
+    automaton = ahocorasick.Automaton()
+    for key, blurb in items:
+        low = key.lower()
+        if low:
+            automaton.add_word(low, automaton.get(low, ()) + ((key, blurb),))
+    automaton.make_automaton()
+    return automaton
+
+
 def find_matches(kb: Dict[str, str], text: str) -> List[Tuple[str, str]]:
     if not kb or not text:
         return []
     lowered = text.lower()
-    matches = []
-    for key, blurb in kb.items():
-        if key.lower() in lowered:
-            matches.append((key, blurb))
+    if ahocorasick is not None:
+        # one pass over the text for all keywords at once
+        found: Dict[str, str] = {}
+        for _, pairs in _automaton(tuple(kb.items())).iter(lowered):
+            found.update(pairs)
+        matches = list(found.items())
+    else:
+        matches = []
+        for key, blurb in kb.items():
+            if key.lower() in lowered:
+                matches.append((key, blurb))
     # deterministic: longest keyword first, then alpha
     matches.sort(key=lambda kv: (-len(kv[0]), kv[0].lower()))
     return matches[:MAX_MATCHES]
@@ -47,3 +83,17 @@ def format_context(matches: List[Tuple[str, str]]) -> str:
             break
         lines.append(entry)
     return "\n".join(lines)
+
+
+def retrieve(kb: Dict[str, str], text: str) -> Tuple[Tuple[str, ...], str]:
+    """Matched keywords and formatted context for a message; repeated questions skip the scan."""
+    if not kb or not text:
+        return (), ""
+    return _retrieve(tuple(kb.items()), text)
+
+
+@lru_cache(maxsize=256)
+def _retrieve(items: Tuple[Tuple[str, str], ...], text: str) -> Tuple[Tuple[str, ...], str]:
+    # keyed on the kb's contents, like _automaton, so an edited kb is never served stale
+    matches = find_matches(dict(items), text)
+    return tuple(key for key, _ in matches), format_context(matches)
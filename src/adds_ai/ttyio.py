@@ -1,18 +1,67 @@
+import fcntl
 import os
+import select
 import termios
 import tty
+from typing import List
+
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+_HAVE_WRITEV = hasattr(os, "writev")
 
 
 def open_tty(path: str) -> int:
-    """Open a TTY in raw mode without becoming controlling terminal."""
+    """Open a TTY in raw, non-blocking mode without becoming controlling terminal."""
     fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
     tty.setraw(fd, when=termios.TCSANOW)
+    flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+    fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
     return fd
 
 
 def write_bytes(fd: int, data: bytes) -> None:
-    os.write(fd, data)
+    writev_bytes(fd, [data])
+
+
+def writev_bytes(fd: int, parts: List[bytes]) -> None:
+    """Gather-write a frame's parts without joining them, resuming after short writes."""
+    if not _HAVE_WRITEV:
+        _write_all(fd, b"".join(parts))
+        return
+    bufs = [memoryview(p) for p in parts if p]
+    i = 0
+    while i < len(bufs):
+        try:
+            n = os.writev(fd, bufs[i : i + _IOV_MAX])
+        except BlockingIOError:
+            # output queue full (slow serial line): wait for it to drain
+            select.select([], [fd], [])
+            continue
+        while n:
+            size = len(bufs[i])
+            if n < size:
+                bufs[i] = bufs[i][n:]
+                break
+            n -= size
+            i += 1
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        try:
+            n = os.write(fd, view)
+        except BlockingIOError:
+            select.select([], [fd], [])
+            continue
+        view = view[n:]
 
 
 def read_bytes(fd: int, n: int = 1) -> bytes:
-    return os.read(fd, n)
+    """Read up to n bytes; returns b"" when nothing is waiting."""
+    try:
+        return os.read(fd, n)
+    except BlockingIOError:
+        return b""